@@ -29,6 +29,7 @@ class AromaLinkAuthCoordinator(DataUpdateCoordinator):
         self.verify_ssl = verify_ssl
         self.allow_ssl_fallback = allow_ssl_fallback
         self._ssl_fallback_notified = False
+        self._login_lock = asyncio.Lock()  # Concurrent requests share one login
 
         super().__init__(
             hass,
@@ -88,13 +89,25 @@ class AromaLinkAuthCoordinator(DataUpdateCoordinator):
             else:
                 raise
 
+    def _session_valid(self):
+        """Return True if the current session can be reused."""
+        # 20 min or temp ID
+        session_age = time.time() - self._last_login_time
+        return not (
+            self.jsessionid is None
+            or self.jsessionid.startswith("temp_")
+            or session_age > 1200
+        )
+
     async def _ensure_login(self):
         """Ensure we have a valid session, login if needed."""
-        current_time = time.time()
-        session_age = current_time - self._last_login_time
+        if self._session_valid():
+            return True
 
-        # 20 min or temp ID
-        if self.jsessionid is None or self.jsessionid.startswith("temp_") or session_age > 1200:
+        async with self._login_lock:
+            # Another request may have logged in while we waited
+            if self._session_valid():
+                return True
             _LOGGER.debug(
                 "Session expired, temporary, or not established. Attempting login.")
             login_success = await self._login()
@@ -1,6 +1,8 @@
 import asyncio
+import functools
 import logging
 from datetime import timedelta
+from types import MappingProxyType
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from .const import (
     DOMAIN,
@@ -11,6 +13,28 @@ from .const import (
 
 _LOGGER = logging.getLogger(__name__)
 
+# Maps spaces and dashes to underscores when deriving helper entity prefixes
+_SANITIZE = str.maketrans({" ": "_", "-": "_"})
+
+
+@functools.lru_cache(maxsize=64)
+def helper_entity_ids(helper_prefix: str) -> tuple:
+    """Return the helper entity ids of programs 1-5 for a helper prefix.
+
+    The result is cached and shared, so each program's ids are read-only.
+    """
+    return tuple(
+        MappingProxyType({
+            "enabled": f"input_boolean.{helper_prefix}_program_{i}_enabled",
+            "start": f"input_datetime.{helper_prefix}_program_{i}_start",
+            "end": f"input_datetime.{helper_prefix}_program_{i}_end",
+            "work": f"input_number.{helper_prefix}_program_{i}_work",
+            "pause": f"input_number.{helper_prefix}_program_{i}_pause",
+            "level": f"input_select.{helper_prefix}_program_{i}_level",
+        })
+        for i in range(1, 6)
+    )
+
 
 class AromaLinkDeviceCoordinator(DataUpdateCoordinator):
     """Coordinator for handling device data and control."""
@@ -30,10 +54,14 @@ class AromaLinkDeviceCoordinator(DataUpdateCoordinator):
         self.auth_coordinator = auth_coordinator
         self.device_id = device_id
         self.device_name = device_name
+        # Default prefix of the input_* helpers used by the workset services
+        self.helper_prefix = f"aromalink_{device_name.lower().translate(_SANITIZE)}"
+        self.helper_entity_ids = helper_entity_ids(self.helper_prefix)
         self._diffuse_time = DEFAULT_DIFFUSE_TIME
         self._work_duration = DEFAULT_WORK_DURATION
         self._pause_duration = DEFAULT_PAUSE_DURATION
         self._schedule_cache = {}  # Cache schedules per day (0-6)
+        self._fetch_all_task = None  # In-flight async_fetch_all_schedules run
         # Editor state for schedule entities
         self._current_program = 1  # Currently selected program (1-5)
         self._current_day = 0  # Currently selected day for viewing (0-6)
@@ -171,7 +199,7 @@ class AromaLinkDeviceCoordinator(DataUpdateCoordinator):
         """Request persistence of oil tracking/calibration state."""
         if not self._save_oil_state_cb:
             return
-        self.hass.async_create_task(self._save_oil_state_cb())
+        self._save_oil_state_cb()
 
     def _apply_oil_state(self, oil_state):
         """Apply persisted oil state to coordinator."""
@@ -856,12 +884,39 @@ class AromaLinkDeviceCoordinator(DataUpdateCoordinator):
             _LOGGER.debug(f"Cached schedule for day {week_day}")
         return workset
 
-    async def async_fetch_all_schedules(self):
+    async def async_fetch_all_schedules(self, force=False):
         """Fetch schedules for all 7 days in parallel.
         
+        Concurrent callers (e.g. repeated Sync Schedules presses) share the
+        fetch that is already in flight instead of starting another one.
+        
+        Args:
+            force: Set after a write. A fetch already in flight may have
+                read the schedules before the write, so wait for it to
+                finish and fetch again.
+        
         Returns:
             Dict mapping day (0-6) to list of 5 program dictionaries.
         """
+        task = self._fetch_all_task
+        if force and task is not None and not task.done():
+            await asyncio.wait((task,))
+        if self._fetch_all_task is None or self._fetch_all_task.done():
+            self._fetch_all_task = self.hass.async_create_task(
+                self._async_fetch_all_schedules()
+            )
+        # Shield so one caller being cancelled does not cancel the others
+        await asyncio.shield(self._fetch_all_task)
+        return self._schedule_cache.copy()
+
+    def async_cancel_fetch_all(self):
+        """Cancel an in-flight async_fetch_all_schedules run (on unload)."""
+        if self._fetch_all_task is not None and not self._fetch_all_task.done():
+            self._fetch_all_task.cancel()
+        self._fetch_all_task = None
+
+    async def _async_fetch_all_schedules(self):
+        """Fetch all 7 days and update the schedule cache."""
         _LOGGER.debug(f"Fetching all schedules for device {self.device_id}")
         
         # Fetch all 7 days in parallel
@@ -876,7 +931,6 @@ class AromaLinkDeviceCoordinator(DataUpdateCoordinator):
                 self._schedule_cache[day] = result
         
         _LOGGER.info(f"Fetched all schedules for device {self.device_id}: {len(self._schedule_cache)} days cached")
-        return self._schedule_cache.copy()
 
     def get_schedule_matrix(self):
         """Return the cached schedule matrix (7 days × 5 programs).
@@ -1,9 +1,15 @@
 """The Aroma-Link integration."""
+import asyncio
+import functools
+import json
 import logging
 import os
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
 
 from .AromaLinkAuthCoordinator import AromaLinkAuthCoordinator
-from .AromaLinkDeviceCoordinator import AromaLinkDeviceCoordinator
+from .AromaLinkDeviceCoordinator import AromaLinkDeviceCoordinator, helper_entity_ids
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, ServiceCall
@@ -11,6 +17,7 @@ from homeassistant.const import CONF_USERNAME, CONF_PASSWORD
 from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.storage import Store
 from homeassistant.components.http import StaticPathConfig
+from homeassistant.loader import async_get_integration
 import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
 
@@ -23,6 +30,9 @@ from .const import (
     CONF_ALLOW_SSL_FALLBACK,
     DEFAULT_POLL_INTERVAL_SECONDS,
     DEFAULT_DEBUG_LOGGING,
+    OIL_STATE_SAVE_DELAY,
+    EVENT_TIMED_RUN,
+    EVENT_OIL_RUNTIME_RESET,
     VERIFY_SSL,
     SERVICE_SET_SCHEDULER,
     SERVICE_RUN_DIFFUSER,
@@ -37,19 +47,57 @@ _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS = ["switch", "button", "number", "sensor", "select", "text"]
 
+# hass.data[DOMAIN] key caching the merged device coordinators of all entries
+_ALL_COORDINATORS = "all_device_coordinators"
+
+# Options the update listener can apply without reloading the entry
+_LIVE_OPTIONS = frozenset({CONF_POLL_INTERVAL, CONF_DEBUG_LOGGING})
+
+# Path to the www folder in this integration
+_WWW_DIR = os.path.join(os.path.dirname(__file__), "www")
+
+# Default week_days for the set_scheduler service (0=Monday ... 6=Sunday)
+_ALL_WEEK_DAYS = (0, 1, 2, 3, 4, 5, 6)
+
+# Diffuser consistence level <-> helper input_select option
+_LEVEL_INT_TO_STR = {1: "A", 2: "B", 3: "C"}
+_LEVEL_STR_TO_INT = {"A": "1", "B": "2", "C": "3"}
+# Letter or numeric level -> API consistenceLevel (save_schedule_batch)
+_LEVEL_TO_API = {**_LEVEL_STR_TO_INT, 1: "1", 2: "2", 3: "3"}
+
+# Domains of the helper config entries created by earlier versions
+_HELPER_DOMAINS = frozenset(
+    {"input_boolean", "input_datetime", "input_number", "input_select"}
+)
+
+# Shared sub-validators, built once and reused across service schemas
+_WEEK_DAY = vol.All(vol.Coerce(int), vol.Range(min=0, max=6))
+_WEEK_DAYS = vol.All(cv.ensure_list, [_WEEK_DAY])
+_DURATION = vol.All(vol.Coerce(int), vol.Range(min=5, max=900))
+
 SET_SCHEDULER_SCHEMA = vol.Schema({
-    vol.Required(ATTR_WORK_DURATION): vol.All(vol.Coerce(int), vol.Range(min=5, max=900)),
-    vol.Optional(ATTR_PAUSE_DURATION): vol.All(vol.Coerce(int), vol.Range(min=5, max=900)),
-    vol.Optional(ATTR_WEEK_DAYS): vol.All(
-        cv.ensure_list, [vol.All(vol.Coerce(int), vol.Range(min=0, max=6))]
-    ),
+    vol.Required(ATTR_WORK_DURATION): _DURATION,
+    vol.Optional(ATTR_PAUSE_DURATION): _DURATION,
+    vol.Optional(ATTR_WEEK_DAYS, default=list(_ALL_WEEK_DAYS)): _WEEK_DAYS,
     vol.Optional("device_id"): cv.string,
 })
 
 RUN_DIFFUSER_SCHEMA = vol.Schema({
-    vol.Optional(ATTR_WORK_DURATION): vol.All(vol.Coerce(int), vol.Range(min=5, max=900)),
-    vol.Optional(ATTR_PAUSE_DURATION): vol.All(vol.Coerce(int), vol.Range(min=5, max=900)),
+    vol.Optional(ATTR_WORK_DURATION): _DURATION,
+    vol.Optional(ATTR_PAUSE_DURATION): _DURATION,
+    vol.Optional("device_id"): cv.string,
+})
+
+LOAD_WORKSET_SCHEMA = vol.Schema({
+    vol.Optional("device_id"): cv.string,
+    vol.Optional("week_day", default=0): _WEEK_DAY,
+    vol.Optional("helper_prefix"): cv.string,
+})
+
+SAVE_WORKSET_SCHEMA = vol.Schema({
     vol.Optional("device_id"): cv.string,
+    vol.Required("week_days"): _WEEK_DAYS,
+    vol.Optional("helper_prefix"): cv.string,
 })
 
 API_DIAGNOSTICS_SCHEMA = vol.Schema({
@@ -63,73 +111,206 @@ API_DIAGNOSTICS_SCHEMA = vol.Schema({
     vol.Optional("fire_event", default=True): cv.boolean,
 })
 
+SET_EDITOR_PROGRAM_SCHEMA = vol.Schema({
+    vol.Optional("device_id"): cv.string,
+    vol.Optional("day", default=0): _WEEK_DAY,
+    vol.Optional("program", default=1): vol.All(vol.Coerce(int), vol.Range(min=1, max=5)),
+})
+
+REFRESH_ALL_SCHEDULES_SCHEMA = vol.Schema({
+    vol.Optional("device_id"): cv.string,
+})
+
+SAVE_SCHEDULE_BATCH_SCHEMA = vol.Schema({
+    vol.Optional("device_id"): cv.string,
+    vol.Required("schedules"): vol.All(cv.ensure_list, [vol.Schema({
+        vol.Required("day"): _WEEK_DAY,
+        vol.Required("programs"): vol.All(cv.ensure_list, [vol.Schema({
+            vol.Optional("startTime", default="00:00"): cv.string,
+            vol.Optional("endTime", default="23:59"): cv.string,
+            vol.Optional("enabled", default=0): vol.Coerce(int),
+            vol.Optional("level", default="A"): cv.string,
+            vol.Optional("workSec", default=10): vol.Coerce(int),
+            vol.Optional("pauseSec", default=120): vol.Coerce(int),
+        })]),
+    })]),
+})
 
-async def _cleanup_old_helpers(hass: HomeAssistant, device_name: str):
+START_TIMED_RUN_SCHEMA = vol.Schema({
+    vol.Optional("device_id"): cv.string,
+    vol.Optional("duration_hours", default=6.0): vol.All(vol.Coerce(float), vol.Range(min=0.1, max=24)),
+    vol.Optional("work_sec"): vol.All(vol.Coerce(int), vol.Range(min=1, max=999)),
+    vol.Optional("pause_sec"): vol.All(vol.Coerce(int), vol.Range(min=1, max=9999)),
+})
+
+CANCEL_TIMED_RUN_SCHEMA = vol.Schema({
+    vol.Optional("device_id"): cv.string,
+})
+
+GET_TIMED_RUN_STATUS_SCHEMA = vol.Schema({
+    vol.Optional("device_id"): cv.string,
+})
+
+RESET_OIL_RUNTIME_SCHEMA = vol.Schema({
+    vol.Optional("device_id"): cv.string,
+})
+
+
+def _read_bool(states_get, entity_id, default):
+    """Return 1 if a helper boolean is on, otherwise the default."""
+    state = states_get(entity_id)
+    return 1 if state and state.state == "on" else default
+
+
+def _read_time(states_get, entity_id, default):
+    """Return HH:MM from a helper datetime, or the default."""
+    state = states_get(entity_id)
+    if state and state.state:
+        dt_str = state.state
+        # "YYYY-MM-DD HH:MM:SS" for date+time helpers
+        if len(dt_str) >= 16 and dt_str[10] == " ":
+            return dt_str[11:16]
+        # "HH:MM:SS" for time-only helpers
+        if len(dt_str) >= 5 and dt_str[2] == ":":
+            return dt_str[:5]
+    return default
+
+
+def _read_int(states_get, entity_id, default):
+    """Return a helper number as an integer string, or the default."""
+    state = states_get(entity_id)
+    if state and state.state:
+        # input_number states are "10.0"-style strings; keep the integer part
+        value = state.state.partition(".")[0]
+        if value.isdigit():
+            return value
+    return default
+
+
+def _read_level(states_get, entity_id, default):
+    """Return the API consistence level ("1"-"3") for a helper select."""
+    state = states_get(entity_id)
+    if state and state.state:
+        return _LEVEL_STR_TO_INT.get(state.state, default)
+    return default
+
+
+def _helper_has_value(current, service, data):
+    """Return True if a helper state already matches what a service call would set."""
+    if service == "turn_on":
+        return current == "on"
+    if service == "turn_off":
+        return current == "off"
+    if service == "set_datetime":
+        # Matches both "HH:MM:SS" and "YYYY-MM-DD HH:MM:SS" states
+        return current.endswith(data["time"])
+    if service == "set_value":
+        try:
+            return float(current) == data["value"]
+        except ValueError:
+            return False
+    if service == "select_option":
+        return current == data["option"]
+    return False
+
+
+# workTimeList key, helper field, reader, default
+_PROGRAM_FIELDS = (
+    ("startTime", "start", _read_time, "00:00"),
+    ("endTime", "end", _read_time, "23:59"),
+    ("enabled", "enabled", _read_bool, 0),
+    ("consistenceLevel", "level", _read_level, "1"),
+    ("workDuration", "work", _read_int, "10"),
+    ("pauseDuration", "pause", _read_int, "120"),
+)
+
+
+def _build_program(states_get, ids):
+    """Build one workTimeList entry from the helper entities of a program."""
+    return {
+        key: read(states_get, ids[field], default)
+        for key, field, read, default in _PROGRAM_FIELDS
+    }
+
+
+async def _cleanup_old_helpers(hass: HomeAssistant, device_name: str, helper_prefix: str):
     """Remove old helper entities created by previous version of the integration."""
-    helper_prefix = f"aromalink_{device_name.lower().replace(' ', '_').replace('-', '_')}"
     entity_registry = er.async_get(hass)
     removed_count = 0
     config_entry_ids = set()
-    entity_ids_to_remove = set()
 
-    prefixes = (
-        f"input_boolean.{helper_prefix}_program_",
-        f"input_datetime.{helper_prefix}_program_",
-        f"input_number.{helper_prefix}_program_",
-        f"input_select.{helper_prefix}_program_",
-    )
-    selected_day_entity_id = f"input_select.{helper_prefix}_selected_day"
+    # The old helpers have known entity ids, so look them up directly
+    # instead of scanning the whole registry
+    candidates = [f"input_select.{helper_prefix}_selected_day"]
+    for ids in helper_entity_ids(helper_prefix):
+        candidates.extend(ids.values())
+
+    registry_entities = entity_registry.entities
+    entity_ids_to_remove = {
+        entity_id for entity_id in candidates if entity_id in registry_entities
+    }
+    if not entity_ids_to_remove:
+        _LOGGER.debug("No old helper entities found for %s (prefix: %s)", device_name, helper_prefix)
+        return
 
-    for reg_entity in entity_registry.entities.values():
-        entity_id = reg_entity.entity_id
-        if entity_id == selected_day_entity_id or entity_id.startswith(prefixes):
-            entity_ids_to_remove.add(entity_id)
-            if reg_entity.config_entry_id:
-                config_entry_ids.add(reg_entity.config_entry_id)
+    for entity_id in entity_ids_to_remove:
+        reg_entity = registry_entities.get(entity_id)
+        if reg_entity and reg_entity.config_entry_id:
+            config_entry_ids.add(reg_entity.config_entry_id)
 
     # Remove entities from registry and state
     for entity_id in entity_ids_to_remove:
         try:
             entity_registry.async_remove(entity_id)
-            _LOGGER.debug(f"Removed helper entity from registry: {entity_id}")
+        except KeyError:
+            # Already removed (e.g. together with its config entry)
+            _LOGGER.debug("Helper entity already gone from registry: %s", entity_id)
+        else:
+            _LOGGER.debug("Removed helper entity from registry: %s", entity_id)
             removed_count += 1
-        except Exception as e:
-            _LOGGER.warning(f"Failed to remove {entity_id} from registry: {e}")
 
-        if entity_id in hass.states.async_entity_ids():
-            try:
-                hass.states.async_remove(entity_id)
-                _LOGGER.debug(f"Removed helper entity from state: {entity_id}")
-            except Exception as e:
-                _LOGGER.warning(f"Failed to remove {entity_id} from state: {e}")
+        # async_remove reports whether a state existed, so no lookup is needed
+        if hass.states.async_remove(entity_id):
+            _LOGGER.debug("Removed helper entity from state: %s", entity_id)
 
     # Remove helper config entries (this actually deletes helpers so they don't come back)
-    for entry_id in config_entry_ids:
-        config_entry = hass.config_entries.async_get_entry(entry_id)
-        if config_entry and config_entry.domain in {
-            "input_boolean",
-            "input_datetime",
-            "input_number",
-            "input_select",
-        }:
-            try:
-                await hass.config_entries.async_remove(entry_id)
-                _LOGGER.debug(f"Removed helper config entry: {entry_id}")
-            except Exception as e:
-                _LOGGER.warning(f"Failed to remove helper config entry {entry_id}: {e}")
+    helper_entry_ids = [
+        entry_id
+        for entry_id in config_entry_ids
+        if (config_entry := hass.config_entries.async_get_entry(entry_id))
+        and config_entry.domain in _HELPER_DOMAINS
+    ]
+    results = await asyncio.gather(
+        *(hass.config_entries.async_remove(entry_id) for entry_id in helper_entry_ids),
+        return_exceptions=True,
+    )
+    for entry_id, result in zip(helper_entry_ids, results):
+        if isinstance(result, Exception):
+            _LOGGER.warning("Failed to remove helper config entry %s: %s", entry_id, result)
+        else:
+            _LOGGER.debug("Removed helper config entry: %s", entry_id)
 
     if removed_count > 0 or config_entry_ids:
         _LOGGER.info(
-            f"Cleaned up old helper entities for {device_name} "
-            f"(prefix: {helper_prefix}, entities: {removed_count}, entries: {len(config_entry_ids)})"
+            "Cleaned up old helper entities for %s (prefix: %s, entities: %d, entries: %d)",
+            device_name,
+            helper_prefix,
+            removed_count,
+            len(config_entry_ids),
         )
     else:
-        _LOGGER.debug(f"No old helper entities found for {device_name} (prefix: {helper_prefix})")
+        _LOGGER.debug("No old helper entities found for %s (prefix: %s)", device_name, helper_prefix)
 
 
 async def async_setup(hass: HomeAssistant, config: dict):
     """Set up the Aroma-Link component."""
     hass.data.setdefault(DOMAIN, {})
+    # Active timed runs: {device_id: _TimedRun}
+    hass.data[DOMAIN].setdefault("timed_runs", {})
+
+    # Services are shared by all config entries and resolve their
+    # coordinators from hass.data at call time
+    _async_register_services(hass)
     
     # Register the custom card's static path
     await _register_frontend_resources(hass)
@@ -139,72 +320,92 @@ async def async_setup(hass: HomeAssistant, config: dict):
 
 async def _register_frontend_resources(hass: HomeAssistant):
     """Register custom card resources for the Lovelace frontend."""
-    # Path to the www folder in this integration
-    www_path = os.path.join(os.path.dirname(__file__), "www")
     card_file = "aroma-link-schedule-card.js"
-    card_path = os.path.join(www_path, card_file)
+    card_path = os.path.join(_WWW_DIR, card_file)
     
-    if not os.path.exists(card_path):
-        _LOGGER.warning(f"Custom card not found at {card_path}")
+    # Avoid blocking the event loop with file system access
+    if not await hass.async_add_executor_job(os.path.isfile, card_path):
+        _LOGGER.warning("Custom card not found at %s", card_path)
         return
     
     # Register static path so the file is accessible
     url_path = f"/aroma_link_integration/{card_file}"
     
+    # Version the resource URL so browsers can cache the card until the
+    # integration is updated
+    integration = await async_get_integration(hass, DOMAIN)
+    resource_url = f"{url_path}?v={integration.version}"
+    
     try:
         # Register static path for serving the JS file
         await hass.http.async_register_static_paths([
-            StaticPathConfig(url_path, card_path, cache_headers=False)
+            StaticPathConfig(url_path, card_path, cache_headers=True)
         ])
-        _LOGGER.debug(f"Registered static path: {url_path}")
+        _LOGGER.debug("Registered static path: %s", url_path)
     except Exception as e:
-        _LOGGER.warning(f"Failed to register static path: {e}")
+        _LOGGER.warning("Failed to register static path: %s", e)
         return
     
     # Add the resource to Lovelace
     try:
-        await _add_lovelace_resource(hass, url_path)
+        await _add_lovelace_resource(hass, url_path, resource_url)
     except Exception as e:
-        _LOGGER.warning(f"Failed to add Lovelace resource: {e}")
+        _LOGGER.warning("Failed to add Lovelace resource: %s", e)
 
 
-async def _add_lovelace_resource(hass: HomeAssistant, url_path: str):
+async def _add_lovelace_resource(hass: HomeAssistant, url_path: str, resource_url: str):
     """Add the custom card to Lovelace resources if not already present."""
     # Check if lovelace resources component is available
     if "lovelace" not in hass.data:
         _LOGGER.debug("Lovelace not yet loaded, will try via storage")
     
-    # Use the resources storage directly
-    from homeassistant.components.lovelace.resources import ResourceStorageCollection
-    
     resources_collection = hass.data.get("lovelace", {}).get("resources")
     
     if resources_collection is None:
         # Lovelace resources not initialized yet, store for later
-        hass.data.setdefault(DOMAIN, {})["pending_resource"] = url_path
+        hass.data.setdefault(DOMAIN, {})["pending_resource"] = resource_url
         _LOGGER.info(
-            f"Custom card resource will be available at: {url_path}\n"
+            "Custom card resource will be available at: %s\n"
             "Add to Lovelace resources manually if needed:\n"
-            f"  URL: {url_path}\n"
-            "  Type: JavaScript Module"
+            "  URL: %s\n"
+            "  Type: JavaScript Module",
+            resource_url,
+            resource_url,
         )
         return
     
-    # Check if already registered
-    existing_urls = [r.get("url") for r in resources_collection.async_items()]
-    if url_path in existing_urls:
-        _LOGGER.debug(f"Resource already registered: {url_path}")
+    # Single pass that stops at the first resource for this card
+    existing = next(
+        (
+            resource
+            for resource in resources_collection.async_items()
+            if resource.get("url", "").partition("?")[0] == url_path
+        ),
+        None,
+    )
+    if existing is not None:
+        if existing["url"] == resource_url:
+            _LOGGER.debug("Resource already registered: %s", resource_url)
+            return
+        # Point a resource registered for another version at the current one
+        try:
+            await resources_collection.async_update_item(
+                existing["id"], {"url": resource_url}
+            )
+            _LOGGER.info("Updated Lovelace resource: %s", resource_url)
+        except Exception as e:
+            _LOGGER.warning("Could not update Lovelace resource: %s", e)
         return
     
     # Add the resource
     try:
         await resources_collection.async_create_item({
-            "url": url_path,
+            "url": resource_url,
             "type": "module"
         })
-        _LOGGER.info(f"Registered Lovelace resource: {url_path}")
+        _LOGGER.info("Registered Lovelace resource: %s", resource_url)
     except Exception as e:
-        _LOGGER.warning(f"Could not auto-register Lovelace resource: {e}")
+        _LOGGER.warning("Could not auto-register Lovelace resource: %s", e)
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
@@ -212,7 +413,10 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        data = hass.data[DOMAIN].pop(entry.entry_id)
+        for coordinator in data["device_coordinators"].values():
+            coordinator.async_cancel_fetch_all()
+        hass.data[DOMAIN].pop(_ALL_COORDINATORS, None)
 
     return unload_ok
 
@@ -221,164 +425,319 @@ def _apply_debug_logging(entry: ConfigEntry) -> None:
     """Apply debug logging based on the config entry options."""
     debug_enabled = entry.options.get(CONF_DEBUG_LOGGING, DEFAULT_DEBUG_LOGGING)
     level = logging.DEBUG if debug_enabled else logging.INFO
-    logging.getLogger("custom_components.aroma_link_integration").setLevel(level)
+    logger = logging.getLogger("custom_components.aroma_link_integration")
+    if logger.level != level:
+        logger.setLevel(level)
+
+
+def _poll_interval_seconds(entry: ConfigEntry) -> int:
+    """Return the configured device poll interval in seconds."""
+    poll_interval_seconds = entry.options.get(
+        CONF_POLL_INTERVAL, DEFAULT_POLL_INTERVAL_SECONDS
+    )
+    # Handle migration from old minutes-based config
+    if poll_interval_seconds <= 30:
+        poll_interval_seconds = poll_interval_seconds * 60
+    return poll_interval_seconds
 
 
 async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle options updates."""
     _apply_debug_logging(entry)
+
+    entry_data = hass.data[DOMAIN].get(entry.entry_id)
+    if entry_data is not None:
+        previous = entry_data["options"]
+        changed = {
+            key
+            for key in previous.keys() | entry.options.keys()
+            if previous.get(key) != entry.options.get(key)
+        }
+        if changed <= _LIVE_OPTIONS:
+            # Poll interval and debug logging apply without a reload
+            entry_data["options"] = dict(entry.options)
+            update_interval = timedelta(seconds=_poll_interval_seconds(entry))
+            for coordinator in entry_data["device_coordinators"].values():
+                coordinator.update_interval = update_interval
+            return
+
     await hass.config_entries.async_reload(entry.entry_id)
 
 
-async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
-    """Set up Aroma-Link from a config entry."""
-    username = entry.data[CONF_USERNAME]
-    password = entry.data[CONF_PASSWORD]
-    devices = entry.data.get("devices", [])
+def _get_device_coordinators(hass: HomeAssistant) -> dict:
+    """Return the device coordinators of every loaded config entry.
+
+    The result is cached in hass.data until an entry is set up or unloaded.
+    """
+    domain_data = hass.data[DOMAIN]
+    device_coordinators = domain_data.get(_ALL_COORDINATORS)
+    if device_coordinators is not None:
+        return device_coordinators
+
+    device_coordinators = None
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        entry_data = domain_data.get(entry.entry_id)
+        if not entry_data:
+            continue
+        if device_coordinators is None:
+            # Common single-entry case: hand back the entry's dict without copying
+            device_coordinators = entry_data["device_coordinators"]
+        else:
+            device_coordinators = {**device_coordinators, **entry_data["device_coordinators"]}
+    device_coordinators = device_coordinators or {}
+    domain_data[_ALL_COORDINATORS] = device_coordinators
+    return device_coordinators
+
+
+def _resolve_coordinator(hass: HomeAssistant, device_id):
+    """Return the coordinator a service call targets, or None.
+
+    Falls back to the only configured device when device_id is omitted.
+    """
+    device_coordinators = _get_device_coordinators(hass)
+    if device_id and device_id in device_coordinators:
+        return device_coordinators[device_id]
+    if len(device_coordinators) == 1:
+        return next(iter(device_coordinators.values()))
+    if not device_coordinators:
+        _LOGGER.error("No Aroma-Link devices are loaded")
+    else:
+        _LOGGER.error("Multiple devices available, must specify device_id")
+    return None
 
-    if not devices and CONF_DEVICE_ID in entry.data:
-        # Support for old configuration format with single device
-        device_id = entry.data[CONF_DEVICE_ID]
-        device_name = entry.data.get("device_name", "Unknown")
-        devices = [{CONF_DEVICE_ID: device_id, "device_name": device_name}]
 
-    if not devices:
-        _LOGGER.error("No devices found in config entry")
-        return False
+@dataclass(slots=True)
+class _TimedRun:
+    """An active timed run of one device."""
 
-    _LOGGER.info(
-        f"Setting up Aroma-Link integration with {len(devices)} devices")
+    cancel: Callable[[], None]
+    end_time: float  # hass.loop.time() deadline
+    duration_hours: float
 
-    _apply_debug_logging(entry)
-    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
-    verify_ssl = entry.options.get(CONF_VERIFY_SSL)
-    if verify_ssl is None:
-        verify_ssl = entry.data.get(CONF_VERIFY_SSL)
-    if verify_ssl is None:
-        verify_ssl = False
+def _update_timed_run_sensor(hass: HomeAssistant, device_id: str) -> None:
+    """Update the sensor with timer state."""
+    coordinator = _get_device_coordinators(hass).get(device_id)
+    if coordinator:
+        coordinator.async_set_updated_data(coordinator.data)
 
-    allow_ssl_fallback = entry.options.get(CONF_ALLOW_SSL_FALLBACK)
-    if allow_ssl_fallback is None:
-        allow_ssl_fallback = entry.data.get(CONF_ALLOW_SSL_FALLBACK)
-    if allow_ssl_fallback is None:
-        allow_ssl_fallback = True
 
-    # Create a single shared coordinator for authentication
-    auth_coordinator = AromaLinkAuthCoordinator(
-        hass,
-        username=username,
-        password=password,
-        verify_ssl=verify_ssl,
-        allow_ssl_fallback=allow_ssl_fallback,
-    )
+async def _turn_off_device(hass: HomeAssistant, device_id: str) -> None:
+    """Turn off device when timer expires."""
+    coordinator = _get_device_coordinators(hass).get(device_id)
+    if coordinator:
+        _LOGGER.info("Timed run complete for device %s, turning off", device_id)
+        try:
+            await coordinator.turn_on_off(False)
+            # Fire event so card can update
+            hass.bus.async_fire(
+                EVENT_TIMED_RUN,
+                {"kind": "complete", "device_id": device_id}
+            )
+        except Exception as e:
+            _LOGGER.error("Failed to turn off device %s: %s", device_id, e)
 
-    # Force first login and initialization
-    await auth_coordinator.async_config_entry_first_refresh()
+    # Clean up state
+    hass.data[DOMAIN]["timed_runs"].pop(device_id, None)
 
-    # Store coordinators for each device
-    device_coordinators = {}
+    # Update sensor state
+    _update_timed_run_sensor(hass, device_id)
 
-    # Load persisted oil tracking/calibration state
-    oil_state_store = Store(hass, 1, f"{DOMAIN}_oil_state_{entry.entry_id}.json")
-    oil_state_data = await oil_state_store.async_load() or {}
 
-    async def _save_oil_state():
-        """Persist oil tracking/calibration state for all devices."""
-        data = {}
-        for dev_id, coord in device_coordinators.items():
-            data[dev_id] = coord.export_oil_state()
-        await oil_state_store.async_save(data)
+def _fire_turn_off(hass: HomeAssistant, device_id: str) -> None:
+    """Timer callback that ends a timed run."""
+    hass.async_create_task(_turn_off_device(hass, device_id))
 
-    poll_interval_seconds = entry.options.get(
-        CONF_POLL_INTERVAL, DEFAULT_POLL_INTERVAL_SECONDS
-    )
-    # Handle migration from old minutes-based config
-    if poll_interval_seconds <= 30:
-        poll_interval_seconds = poll_interval_seconds * 60
 
-    # Create coordinator for each device
-    for device in devices:
-        device_id = device[CONF_DEVICE_ID]
-        device_name = device.get("device_name", f"Device {device_id}")
+# ============================================================
+# TIMED RUN SERVICES (server-side timer, survives browser close)
+# ============================================================
 
-        _LOGGER.info(
-            f"Initializing device coordinator for {device_name} ({device_id})")
 
-        device_coordinator = AromaLinkDeviceCoordinator(
-            hass,
-            auth_coordinator=auth_coordinator,
-            device_id=device_id,
-            device_name=device_name,
-            update_interval_seconds=poll_interval_seconds,
-            save_oil_state_cb=_save_oil_state,
-            oil_state=oil_state_data.get(str(device_id)) or oil_state_data.get(device_id),
-        )
+async def _start_timed_run_service(hass: HomeAssistant, call: ServiceCall):
+    """Start a timed run for a device."""
+    device_id = call.data.get("device_id")
+    duration_hours = call.data["duration_hours"]
+    work_sec = call.data.get("work_sec")
+    pause_sec = call.data.get("pause_sec")
+    timed_runs = hass.data[DOMAIN]["timed_runs"]
 
-        # Do first refresh for each device
-        try:
-            await device_coordinator.async_config_entry_first_refresh()
-            device_coordinators[device_id] = device_coordinator
-            
-            # Clean up old helper entities from previous version
-            try:
-                await _cleanup_old_helpers(hass, device_name)
-            except Exception as e:
-                _LOGGER.warning(f"Failed to cleanup old helpers for {device_name}: {e}")
-        except Exception as e:
-            _LOGGER.error(f"Error initializing device {device_id}: {e}")
+    coordinator = _resolve_coordinator(hass, device_id)
+    if coordinator is None:
+        return
+    device_id = coordinator.device_id
 
-    if not device_coordinators:
-        _LOGGER.error("Failed to initialize any devices")
-        return False
+    # Cancel any existing timer for this device
+    existing = timed_runs.pop(device_id, None)
+    if existing is not None:
+        existing.cancel()
 
-    # Auto-fetch all schedules on startup (for dashboard matrix view)
-    for device_id, coordinator in device_coordinators.items():
+    # Apply work/pause settings if provided
+    if work_sec is not None or pause_sec is not None:
         try:
-            _LOGGER.debug(f"Auto-fetching all schedules for device {device_id}")
-            await coordinator.async_fetch_all_schedules()
+            if not await coordinator.set_scheduler(
+                work_duration=work_sec or coordinator.data.get("workRemainTime", 5),
+                pause_duration=pause_sec or coordinator.data.get("pauseRemainTime", 900)
+            ):
+                _LOGGER.warning("Failed to set work/pause for timed run")
         except Exception as e:
-            _LOGGER.warning(f"Failed to auto-fetch schedules for device {device_id}: {e}")
+            _LOGGER.warning("Failed to set work/pause for timed run: %s", e)
 
-    hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = {
-        "auth_coordinator": auth_coordinator,
-        "device_coordinators": device_coordinators,
-    }
+    # Turn on the device
+    try:
+        if not await coordinator.turn_on_off(True):
+            _LOGGER.error("Failed to turn on device for timed run")
+            return
+    except Exception as e:
+        _LOGGER.error("Failed to turn on device for timed run: %s", e)
+        return
+
+    # Schedule turn-off
+    duration_seconds = duration_hours * 3600
+    end_time = hass.loop.time() + duration_seconds
+
+    handle = hass.loop.call_at(end_time, _fire_turn_off, hass, device_id)
+
+    timed_runs[device_id] = _TimedRun(handle.cancel, end_time, duration_hours)
+
+    _LOGGER.info("Started timed run for device %s: %s hours", device_id, duration_hours)
+
+    # Fire event for card
+    hass.bus.async_fire(
+        EVENT_TIMED_RUN,
+        {
+            "kind": "started",
+            "device_id": device_id,
+            "duration_hours": duration_hours,
+            "end_time": end_time
+        }
+    )
+
+    _update_timed_run_sensor(hass, device_id)
+
+
+async def _cancel_timed_run_service(hass: HomeAssistant, call: ServiceCall):
+    """Cancel a timed run for a device."""
+    device_id = call.data.get("device_id")
+
+    # Get device_id if not specified
+    if not device_id:
+        coordinator = _resolve_coordinator(hass, None)
+        if coordinator is None:
+            return
+        device_id = coordinator.device_id
+
+    existing = hass.data[DOMAIN]["timed_runs"].pop(device_id, None)
+    if existing is None:
+        _LOGGER.warning("No timed run active for device %s", device_id)
+        return
+
+    # Cancel the timer
+    existing.cancel()
+
+    _LOGGER.info("Cancelled timed run for device %s", device_id)
+
+    # Fire event for card
+    hass.bus.async_fire(
+        EVENT_TIMED_RUN,
+        {"kind": "cancelled", "device_id": device_id}
+    )
+
+    _update_timed_run_sensor(hass, device_id)
+
+
+async def _get_timed_run_status_service(hass: HomeAssistant, call: ServiceCall):
+    """Get the status of timed runs."""
+    device_id = call.data.get("device_id")
+
+    status = {}
+    current_time = hass.loop.time()
+
+    for dev_id, timed_run in hass.data[DOMAIN]["timed_runs"].items():
+        if device_id and dev_id != device_id:
+            continue
+        remaining = max(0, timed_run.end_time - current_time)
+        status[dev_id] = {
+            "active": True,
+            "remaining_seconds": int(remaining),
+            "duration_hours": timed_run.duration_hours
+        }
+
+    # Fire event with status
+    hass.bus.async_fire(
+        EVENT_TIMED_RUN,
+        {"kind": "status", "status": status}
+    )
+
+    return status
+
+
+# ============================================================
+# OIL TRACKING SERVICES
+# ============================================================
+
+
+async def _reset_oil_runtime_service(hass: HomeAssistant, call: ServiceCall):
+    """Reset oil tracking (call when refilling oil).
 
-    # Register services
+    Starts tracking cumulative work time using duty-cycle calculation.
+    Also captures pumpCount as secondary reference.
+    """
+    device_id = call.data.get("device_id")
+
+    coordinator = _resolve_coordinator(hass, device_id)
+    if coordinator is None:
+        return
+
+    # Get current pump count from last data refresh
+    current_pump_count = None
+    if coordinator.data:
+        current_pump_count = coordinator.data.get("pumpCount", 0)
+
+    coordinator.reset_oil_tracking(current_pump_count)
+
+    oil_info = coordinator.get_oil_tracking_info()
+
+    _LOGGER.info(
+        "Reset oil tracking for device %s. "
+        "Baseline pumpCount: %s, "
+        "Current settings: work=%ss, pause=%ss",
+        coordinator.device_id,
+        current_pump_count,
+        oil_info.get("last_work_duration"),
+        oil_info.get("last_pause_duration"),
+    )
+
+    hass.bus.async_fire(
+        EVENT_OIL_RUNTIME_RESET,
+        {
+            "device_id": coordinator.device_id,
+            "baseline_pump_count": current_pump_count,
+            "tracking_started": True,
+        }
+    )
+
+
+def _async_register_services(hass: HomeAssistant) -> None:
+    """Register the integration services (once, from async_setup)."""
     async def set_scheduler_service(call: ServiceCall):
         """Service to set diffuser scheduler."""
-        device_id = call.data.get("device_id")
         work_duration = call.data.get(ATTR_WORK_DURATION)
         pause_duration = call.data.get(ATTR_PAUSE_DURATION)
-        week_days = call.data.get(ATTR_WEEK_DAYS, [0, 1, 2, 3, 4, 5, 6])
-
-        # If device_id specified, use that coordinator
-        if device_id and device_id in device_coordinators:
-            await device_coordinators[device_id].set_scheduler(work_duration, pause_duration, week_days)
-        elif len(device_coordinators) == 1:
-            # If only one device, use that
-            first_device_id = list(device_coordinators.keys())[0]
-            await device_coordinators[first_device_id].set_scheduler(work_duration, pause_duration, week_days)
-        else:
-            _LOGGER.error("Multiple devices available, must specify device_id")
+        week_days = call.data[ATTR_WEEK_DAYS]
+
+        coordinator = _resolve_coordinator(hass, call.data.get("device_id"))
+        if coordinator is not None:
+            await coordinator.set_scheduler(work_duration, pause_duration, week_days)
 
     async def run_diffuser_service(call: ServiceCall):
         """Service to run diffuser for a specific time."""
-        device_id = call.data.get("device_id")
         work_duration = call.data.get(ATTR_WORK_DURATION)
         pause_duration = call.data.get(ATTR_PAUSE_DURATION)
 
-        # If device_id specified, use that coordinator
-        if device_id and device_id in device_coordinators:
-            await device_coordinators[device_id].run_diffuser(work_duration, pause_duration=pause_duration)
-        elif len(device_coordinators) == 1:
-            # If only one device, use that
-            first_device_id = list(device_coordinators.keys())[0]
-            await device_coordinators[first_device_id].run_diffuser(work_duration, pause_duration=pause_duration)
-        else:
-            _LOGGER.error("Multiple devices available, must specify device_id")
+        coordinator = _resolve_coordinator(hass, call.data.get("device_id"))
+        if coordinator is not None:
+            await coordinator.run_diffuser(work_duration, pause_duration=pause_duration)
 
     hass.services.async_register(
         DOMAIN,
@@ -397,13 +756,13 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     async def api_diagnostics_service(call: ServiceCall):
         """Call arbitrary API endpoints for diagnostics."""
         device_id = call.data.get("device_id")
-        path = call.data.get("path")
-        method = call.data.get("method", "GET").upper()
+        path = call.data["path"]
+        method = call.data["method"].upper()
         params = call.data.get("params")
         data = call.data.get("data")
         json_body = call.data.get("json")
-        log_response = call.data.get("log_response", True)
-        fire_event = call.data.get("fire_event", True)
+        log_response = call.data["log_response"]
+        fire_event = call.data["fire_event"]
 
         if not path.startswith("/"):
             path = f"/{path}"
@@ -413,14 +772,8 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
 
         url = f"https://www.aroma-link.com{path}"
 
-        coordinator = None
-        if device_id and device_id in device_coordinators:
-            coordinator = device_coordinators[device_id]
-        elif len(device_coordinators) == 1:
-            coordinator = list(device_coordinators.values())[0]
-
+        coordinator = _resolve_coordinator(hass, device_id)
         if coordinator is None:
-            _LOGGER.error("Multiple devices available, must specify device_id")
             return
 
         try:
@@ -432,7 +785,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
                 json_body=json_body,
             )
         except Exception as exc:
-            _LOGGER.error(f"API diagnostics call failed: {exc}")
+            _LOGGER.error("API diagnostics call failed: %s", exc)
             return
 
         if log_response:
@@ -464,172 +817,103 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     async def load_workset_service(call: ServiceCall):
         """Service to load workset from device into helper entities."""
         device_id = call.data.get("device_id")
-        week_day = call.data.get("week_day", 0)
+        week_day = call.data["week_day"]
         helper_prefix = call.data.get("helper_prefix")
         
-        # Get coordinator
-        coordinator = None
-        if device_id and device_id in device_coordinators:
-            coordinator = device_coordinators[device_id]
-        elif len(device_coordinators) == 1:
-            coordinator = list(device_coordinators.values())[0]
-        else:
-            _LOGGER.error("Multiple devices available, must specify device_id")
+        coordinator = _resolve_coordinator(hass, device_id)
+        if coordinator is None:
             return
         
-        if not helper_prefix:
-            # Use device name as prefix, sanitized
-            helper_prefix = f"aromalink_{coordinator.device_name.lower().replace(' ', '_').replace('-', '_')}"
+        if helper_prefix:
+            helper_ids = helper_entity_ids(helper_prefix)
+        else:
+            # Use the device's default (sanitized device name) helpers
+            helper_prefix = coordinator.helper_prefix
+            helper_ids = coordinator.helper_entity_ids
+        
+        # Nothing to populate (and no API call needed) without any helpers
+        states_get = hass.states.get
+        if not any(
+            states_get(entity_id) is not None
+            for ids in helper_ids
+            for entity_id in ids.values()
+        ):
+            _LOGGER.warning("No helper entities found with prefix %s, nothing to load", helper_prefix)
+            return
         
         # Fetch workset from device
         workset = await coordinator.fetch_workset_for_day(week_day)
         if not workset:
-            _LOGGER.error(f"Failed to load workset for device {coordinator.device_id}")
+            _LOGGER.error("Failed to load workset for device %s", coordinator.device_id)
             return
         
-        # Update helper entities
-        for i, program in enumerate(workset, 1):
-            # Enabled toggle
-            enabled_entity = f"input_boolean.{helper_prefix}_program_{i}_enabled"
-            if enabled_entity in hass.states.async_entity_ids():
-                hass.states.async_set(enabled_entity, "on" if program["enabled"] == 1 else "off")
-            
-            # Start time
-            start_entity = f"input_datetime.{helper_prefix}_program_{i}_start"
-            if start_entity in hass.states.async_entity_ids():
-                start_time = program["start_time"]
-                hass.states.async_set(start_entity, f"2024-01-01 {start_time}:00")
-            
-            # End time
-            end_entity = f"input_datetime.{helper_prefix}_program_{i}_end"
-            if end_entity in hass.states.async_entity_ids():
-                end_time = program["end_time"]
-                hass.states.async_set(end_entity, f"2024-01-01 {end_time}:00")
-            
-            # Work duration
-            work_entity = f"input_number.{helper_prefix}_program_{i}_work"
-            if work_entity in hass.states.async_entity_ids():
-                hass.states.async_set(work_entity, program["work_sec"])
-            
-            # Pause duration
-            pause_entity = f"input_number.{helper_prefix}_program_{i}_pause"
-            if pause_entity in hass.states.async_entity_ids():
-                hass.states.async_set(pause_entity, program["pause_sec"])
-            
-            # Level
-            level_entity = f"input_select.{helper_prefix}_program_{i}_level"
-            if level_entity in hass.states.async_entity_ids():
-                level_map = {1: "A", 2: "B", 3: "C"}
-                level = level_map.get(program["level"], "A")
-                hass.states.async_set(level_entity, level)
+        # Write through the helper services (so the helpers keep their own
+        # state/attributes) and dispatch all calls in one gather
+        calls = []
+        for ids, program in zip(helper_ids, workset):
+            calls.extend((
+                ("input_boolean", "turn_on" if program["enabled"] == 1 else "turn_off",
+                 {"entity_id": ids["enabled"]}),
+                ("input_datetime", "set_datetime",
+                 {"entity_id": ids["start"], "time": f"{program['start_time']}:00"}),
+                ("input_datetime", "set_datetime",
+                 {"entity_id": ids["end"], "time": f"{program['end_time']}:00"}),
+                ("input_number", "set_value",
+                 {"entity_id": ids["work"], "value": program["work_sec"]}),
+                ("input_number", "set_value",
+                 {"entity_id": ids["pause"], "value": program["pause_sec"]}),
+                ("input_select", "select_option",
+                 {"entity_id": ids["level"], "option": _LEVEL_INT_TO_STR.get(program["level"], "A")}),
+            ))
+        
+        # Only touch helpers that exist and do not already hold the value
+        calls = [
+            (domain, service, data)
+            for domain, service, data in calls
+            if (state := states_get(data["entity_id"])) is not None
+            and not _helper_has_value(state.state, service, data)
+        ]
+        results = await asyncio.gather(
+            *(
+                hass.services.async_call(domain, service, data, blocking=True)
+                for domain, service, data in calls
+            ),
+            return_exceptions=True,
+        )
+        for (domain, service, data), result in zip(calls, results):
+            if isinstance(result, Exception):
+                _LOGGER.warning("Failed to update %s via %s.%s: %s", data['entity_id'], domain, service, result)
         
-        _LOGGER.info(f"Loaded workset for device {coordinator.device_id} day {week_day} into helpers with prefix {helper_prefix}")
+        _LOGGER.info("Loaded workset for device %s day %s into helpers with prefix %s", coordinator.device_id, week_day, helper_prefix)
 
     async def save_workset_service(call: ServiceCall):
         """Service to save workset from helper entities to device."""
         device_id = call.data.get("device_id")
-        week_days = call.data.get("week_days", [0, 1, 2, 3, 4, 5, 6])
+        week_days = call.data[ATTR_WEEK_DAYS]
         helper_prefix = call.data.get("helper_prefix")
         
-        # Get coordinator
-        coordinator = None
-        if device_id and device_id in device_coordinators:
-            coordinator = device_coordinators[device_id]
-        elif len(device_coordinators) == 1:
-            coordinator = list(device_coordinators.values())[0]
-        else:
-            _LOGGER.error("Multiple devices available, must specify device_id")
+        coordinator = _resolve_coordinator(hass, device_id)
+        if coordinator is None:
             return
         
-        if not helper_prefix:
-            # Use device name as prefix, sanitized
-            helper_prefix = f"aromalink_{coordinator.device_name.lower().replace(' ', '_').replace('-', '_')}"
+        if helper_prefix:
+            helper_ids = helper_entity_ids(helper_prefix)
+        else:
+            # Use the device's default (sanitized device name) helpers
+            helper_ids = coordinator.helper_entity_ids
         
         # Build workTimeList from helper entities
-        work_time_list = []
-        for i in range(1, 6):  # 5 programs
-            # Get values from helpers
-            enabled_entity = f"input_boolean.{helper_prefix}_program_{i}_enabled"
-            start_entity = f"input_datetime.{helper_prefix}_program_{i}_start"
-            end_entity = f"input_datetime.{helper_prefix}_program_{i}_end"
-            work_entity = f"input_number.{helper_prefix}_program_{i}_work"
-            pause_entity = f"input_number.{helper_prefix}_program_{i}_pause"
-            level_entity = f"input_select.{helper_prefix}_program_{i}_level"
-            
-            enabled = 0
-            if enabled_entity in hass.states.async_entity_ids():
-                state = hass.states.get(enabled_entity)
-                enabled = 1 if state and state.state == "on" else 0
-            
-            start_time = "00:00"
-            if start_entity in hass.states.async_entity_ids():
-                state = hass.states.get(start_entity)
-                if state and state.state:
-                    # Extract time from datetime string
-                    try:
-                        dt_str = state.state
-                        if " " in dt_str:
-                            start_time = dt_str.split(" ")[1][:5]  # Extract HH:MM
-                    except:
-                        pass
-            
-            end_time = "23:59"
-            if end_entity in hass.states.async_entity_ids():
-                state = hass.states.get(end_entity)
-                if state and state.state:
-                    try:
-                        dt_str = state.state
-                        if " " in dt_str:
-                            end_time = dt_str.split(" ")[1][:5]  # Extract HH:MM
-                    except:
-                        pass
-            
-            work_duration = "10"
-            if work_entity in hass.states.async_entity_ids():
-                state = hass.states.get(work_entity)
-                if state and state.state:
-                    work_duration = str(int(float(state.state)))
-            
-            pause_duration = "120"
-            if pause_entity in hass.states.async_entity_ids():
-                state = hass.states.get(pause_entity)
-                if state and state.state:
-                    pause_duration = str(int(float(state.state)))
-            
-            level = "1"
-            if level_entity in hass.states.async_entity_ids():
-                state = hass.states.get(level_entity)
-                if state and state.state:
-                    level_map = {"A": "1", "B": "2", "C": "3"}
-                    level = level_map.get(state.state, "1")
-            
-            work_time_list.append({
-                "startTime": start_time,
-                "endTime": end_time,
-                "enabled": enabled,
-                "consistenceLevel": level,
-                "workDuration": work_duration,
-                "pauseDuration": pause_duration
-            })
+        states_get = hass.states.get
+        work_time_list = [
+            _build_program(states_get, ids) for ids in helper_ids
+        ]
         
         # Save to device
         result = await coordinator.set_workset(week_days, work_time_list)
         if result:
-            _LOGGER.info(f"Saved workset for device {coordinator.device_id} to days {week_days}")
+            _LOGGER.info("Saved workset for device %s to days %s", coordinator.device_id, week_days)
         else:
-            _LOGGER.error(f"Failed to save workset for device {coordinator.device_id}")
-
-    LOAD_WORKSET_SCHEMA = vol.Schema({
-        vol.Optional("device_id"): cv.string,
-        vol.Optional("week_day", default=0): vol.All(vol.Coerce(int), vol.Range(min=0, max=6)),
-        vol.Optional("helper_prefix"): cv.string,
-    })
-
-    SAVE_WORKSET_SCHEMA = vol.Schema({
-        vol.Optional("device_id"): cv.string,
-        vol.Required("week_days"): vol.All(cv.ensure_list, [vol.All(vol.Coerce(int), vol.Range(min=0, max=6))]),
-        vol.Optional("helper_prefix"): cv.string,
-    })
+            _LOGGER.error("Failed to save workset for device %s", coordinator.device_id)
 
     hass.services.async_register(
         DOMAIN,
@@ -649,29 +933,18 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     async def set_editor_program_service(call: ServiceCall):
         """Set the schedule editor to a specific day and program."""
         device_id = call.data.get("device_id")
-        day = call.data.get("day", 0)
-        program = call.data.get("program", 1)
-
-        coordinator = None
-        if device_id and device_id in device_coordinators:
-            coordinator = device_coordinators[device_id]
-        elif len(device_coordinators) == 1:
-            coordinator = list(device_coordinators.values())[0]
-        else:
-            _LOGGER.error("Multiple devices available, must specify device_id")
+        day = call.data["day"]
+        program = call.data["program"]
+
+        coordinator = _resolve_coordinator(hass, device_id)
+        if coordinator is None:
             return
 
         # Refresh schedule for the day first
         await coordinator.async_refresh_schedule(day)
         # Set the editor program
         coordinator.set_editor_program(day, program)
-        _LOGGER.info(f"Set editor to day {day}, program {program} for device {coordinator.device_id}")
-
-    SET_EDITOR_PROGRAM_SCHEMA = vol.Schema({
-        vol.Optional("device_id"): cv.string,
-        vol.Optional("day", default=0): vol.All(vol.Coerce(int), vol.Range(min=0, max=6)),
-        vol.Optional("program", default=1): vol.All(vol.Coerce(int), vol.Range(min=1, max=5)),
-    })
+        _LOGGER.info("Set editor to day %s, program %s for device %s", day, program, coordinator.device_id)
 
     hass.services.async_register(
         DOMAIN,
@@ -685,21 +958,12 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
         """Refresh schedules for all 7 days from the API."""
         device_id = call.data.get("device_id")
 
-        coordinator = None
-        if device_id and device_id in device_coordinators:
-            coordinator = device_coordinators[device_id]
-        elif len(device_coordinators) == 1:
-            coordinator = list(device_coordinators.values())[0]
-        else:
-            _LOGGER.error("Multiple devices available, must specify device_id")
+        coordinator = _resolve_coordinator(hass, device_id)
+        if coordinator is None:
             return
 
         await coordinator.async_fetch_all_schedules()
-        _LOGGER.info(f"Refreshed all schedules for device {coordinator.device_id}")
-
-    REFRESH_ALL_SCHEDULES_SCHEMA = vol.Schema({
-        vol.Optional("device_id"): cv.string,
-    })
+        _LOGGER.info("Refreshed all schedules for device %s", coordinator.device_id)
 
     hass.services.async_register(
         DOMAIN,
@@ -719,22 +983,15 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
         Accepts full schedule data and batches days with identical schedules.
         """
         device_id = call.data.get("device_id")
-        schedules = call.data.get("schedules", [])
+        schedules = call.data["schedules"]
         
-        coordinator = None
-        if device_id and device_id in device_coordinators:
-            coordinator = device_coordinators[device_id]
-        elif len(device_coordinators) == 1:
-            coordinator = list(device_coordinators.values())[0]
-        else:
-            _LOGGER.error("Multiple devices available, must specify device_id")
+        coordinator = _resolve_coordinator(hass, device_id)
+        if coordinator is None:
             return {"success": False, "error": "device_id required"}
         
         if not schedules:
             return {"success": False, "error": "No schedules provided"}
         
-        import json
-        
         # Group schedules by identical work_time_list for batching
         schedule_groups = {}  # JSON key -> (days, work_time_list)
         
@@ -746,7 +1003,6 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
                 continue
             
             # Build work_time_list for this day
-            level_map = {"A": "1", "B": "2", "C": "3", 1: "1", 2: "2", 3: "3"}
             work_time_list = []
             
             for prog in programs:
@@ -754,7 +1010,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
                     "startTime": prog.get("startTime", "00:00"),
                     "endTime": prog.get("endTime", "23:59"),
                     "enabled": prog.get("enabled", 0),
-                    "consistenceLevel": level_map.get(prog.get("level", "A"), "1"),
+                    "consistenceLevel": _LEVEL_TO_API.get(prog.get("level", "A"), "1"),
                     "workDuration": str(prog.get("workSec", 10)),
                     "pauseDuration": str(prog.get("pauseSec", 120))
                 })
@@ -775,37 +1031,22 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
         
         # Make batched API calls
         total_days = sum(len(days) for days, _ in schedule_groups.values())
-        _LOGGER.info(f"Batch save: {total_days} days grouped into {len(schedule_groups)} API calls")
+        _LOGGER.info("Batch save: %s days grouped into %s API calls", total_days, len(schedule_groups))
         
         success_count = 0
         for schedule_key, (days, work_time_list) in schedule_groups.items():
-            _LOGGER.info(f"Saving days {days} in single API call")
+            _LOGGER.info("Saving days %s in single API call", days)
             result = await coordinator.set_workset(days, work_time_list, skip_refresh=True)
             if result:
                 success_count += len(days)
         
         # Single refresh at end
         await coordinator.async_request_refresh()
-        await coordinator.async_fetch_all_schedules()
+        await coordinator.async_fetch_all_schedules(force=True)
         
-        _LOGGER.info(f"Batch save complete: {success_count}/{total_days} days saved")
+        _LOGGER.info("Batch save complete: %s/%s days saved", success_count, total_days)
         return {"success": True, "days_saved": success_count, "api_calls": len(schedule_groups)}
     
-    SAVE_SCHEDULE_BATCH_SCHEMA = vol.Schema({
-        vol.Optional("device_id"): cv.string,
-        vol.Required("schedules"): vol.All(cv.ensure_list, [vol.Schema({
-            vol.Required("day"): vol.All(vol.Coerce(int), vol.Range(min=0, max=6)),
-            vol.Required("programs"): vol.All(cv.ensure_list, [vol.Schema({
-                vol.Optional("startTime", default="00:00"): cv.string,
-                vol.Optional("endTime", default="23:59"): cv.string,
-                vol.Optional("enabled", default=0): vol.Coerce(int),
-                vol.Optional("level", default="A"): cv.string,
-                vol.Optional("workSec", default=10): vol.Coerce(int),
-                vol.Optional("pauseSec", default=120): vol.Coerce(int),
-            })]),
-        })]),
-    })
-    
     hass.services.async_register(
         DOMAIN,
         "save_schedule_batch",
@@ -813,272 +1054,176 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
         schema=SAVE_SCHEDULE_BATCH_SCHEMA
     )
 
-    # ============================================================
-    # TIMED RUN SERVICES (server-side timer, survives browser close)
-    # ============================================================
-    
-    # Storage for active timed runs: {device_id: {"cancel_callback": fn, "end_time": timestamp}}
-    if "timed_runs" not in hass.data[DOMAIN]:
-        hass.data[DOMAIN]["timed_runs"] = {}
-    
-    timed_runs = hass.data[DOMAIN]["timed_runs"]
-
-    async def _turn_off_device(device_id: str):
-        """Turn off device when timer expires."""
-        coordinator = device_coordinators.get(device_id)
-        if coordinator:
-            _LOGGER.info(f"Timed run complete for device {device_id}, turning off")
-            try:
-                await coordinator.set_power(False)
-                # Fire event so card can update
-                hass.bus.async_fire(
-                    f"{DOMAIN}_timed_run_complete",
-                    {"device_id": device_id}
-                )
-            except Exception as e:
-                _LOGGER.error(f"Failed to turn off device {device_id}: {e}")
-        
-        # Clean up state
-        if device_id in timed_runs:
-            del timed_runs[device_id]
-        
-        # Update sensor state
-        _update_timed_run_sensor(device_id)
+    for name, handler, schema in (
+        ("start_timed_run", _start_timed_run_service, START_TIMED_RUN_SCHEMA),
+        ("cancel_timed_run", _cancel_timed_run_service, CANCEL_TIMED_RUN_SCHEMA),
+        ("get_timed_run_status", _get_timed_run_status_service, GET_TIMED_RUN_STATUS_SCHEMA),
+        ("reset_oil_runtime", _reset_oil_runtime_service, RESET_OIL_RUNTIME_SCHEMA),
+    ):
+        hass.services.async_register(
+            DOMAIN, name, functools.partial(handler, hass), schema=schema
+        )
 
-    def _update_timed_run_sensor(device_id: str):
-        """Update the sensor with timer state."""
-        coordinator = device_coordinators.get(device_id)
-        if coordinator:
-            coordinator.async_set_updated_data(coordinator.data)
 
-    async def start_timed_run_service(call: ServiceCall):
-        """Start a timed run for a device."""
-        device_id = call.data.get("device_id")
-        duration_hours = call.data.get("duration_hours", 6.0)
-        work_sec = call.data.get("work_sec")
-        pause_sec = call.data.get("pause_sec")
-
-        # Get coordinator
-        coordinator = None
-        if device_id and device_id in device_coordinators:
-            coordinator = device_coordinators[device_id]
-            device_id = device_id  # Already set
-        elif len(device_coordinators) == 1:
-            device_id = list(device_coordinators.keys())[0]
-            coordinator = device_coordinators[device_id]
-        else:
-            _LOGGER.error("Multiple devices available, must specify device_id")
-            return
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
+    """Set up Aroma-Link from a config entry."""
+    username = entry.data[CONF_USERNAME]
+    password = entry.data[CONF_PASSWORD]
+    devices = entry.data.get("devices", [])
 
-        # Cancel any existing timer for this device
-        if device_id in timed_runs:
-            existing = timed_runs[device_id]
-            if existing.get("cancel_callback"):
-                existing["cancel_callback"]()
-            del timed_runs[device_id]
-
-        # Apply work/pause settings if provided
-        if work_sec is not None or pause_sec is not None:
-            try:
-                await coordinator.set_scheduler(
-                    work_duration=work_sec or coordinator.data.get("workRemainTime", 5),
-                    pause_duration=pause_sec or coordinator.data.get("pauseRemainTime", 900)
-                )
-            except Exception as e:
-                _LOGGER.warning(f"Failed to set work/pause for timed run: {e}")
-
-        # Turn on the device
-        try:
-            await coordinator.set_power(True)
-        except Exception as e:
-            _LOGGER.error(f"Failed to turn on device for timed run: {e}")
-            return
+    if not devices and CONF_DEVICE_ID in entry.data:
+        # Support for old configuration format with single device
+        device_id = entry.data[CONF_DEVICE_ID]
+        device_name = entry.data.get("device_name", "Unknown")
+        devices = [{CONF_DEVICE_ID: device_id, "device_name": device_name}]
 
-        # Schedule turn-off
-        duration_seconds = duration_hours * 3600
-        end_time = hass.loop.time() + duration_seconds
-        
-        cancel_callback = hass.helpers.event.async_call_later(
-            hass,
-            duration_seconds,
-            lambda _: hass.async_create_task(_turn_off_device(device_id))
+    # Validate devices before logging in so misconfigured entries fail fast
+    valid_devices = [device for device in devices if device.get(CONF_DEVICE_ID)]
+    if len(valid_devices) != len(devices):
+        _LOGGER.error(
+            "Ignoring %d device(s) without a device_id in config entry",
+            len(devices) - len(valid_devices),
         )
+    devices = valid_devices
 
-        timed_runs[device_id] = {
-            "cancel_callback": cancel_callback,
-            "end_time": end_time,
-            "duration_hours": duration_hours
-        }
+    if not devices:
+        _LOGGER.error("No devices found in config entry")
+        return False
 
-        _LOGGER.info(f"Started timed run for device {device_id}: {duration_hours} hours")
-        
-        # Fire event for card
-        hass.bus.async_fire(
-            f"{DOMAIN}_timed_run_started",
-            {
-                "device_id": device_id,
-                "duration_hours": duration_hours,
-                "end_time": end_time
-            }
-        )
-        
-        _update_timed_run_sensor(device_id)
+    _LOGGER.info(
+        "Setting up Aroma-Link integration with %d devices", len(devices))
 
-    async def cancel_timed_run_service(call: ServiceCall):
-        """Cancel a timed run for a device."""
-        device_id = call.data.get("device_id")
+    _apply_debug_logging(entry)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
-        # Get device_id if not specified
-        if not device_id and len(device_coordinators) == 1:
-            device_id = list(device_coordinators.keys())[0]
-        
-        if not device_id:
-            _LOGGER.error("Multiple devices available, must specify device_id")
-            return
+    verify_ssl = entry.options.get(CONF_VERIFY_SSL)
+    if verify_ssl is None:
+        verify_ssl = entry.data.get(CONF_VERIFY_SSL)
+    if verify_ssl is None:
+        verify_ssl = False
 
-        if device_id not in timed_runs:
-            _LOGGER.warning(f"No timed run active for device {device_id}")
-            return
+    allow_ssl_fallback = entry.options.get(CONF_ALLOW_SSL_FALLBACK)
+    if allow_ssl_fallback is None:
+        allow_ssl_fallback = entry.data.get(CONF_ALLOW_SSL_FALLBACK)
+    if allow_ssl_fallback is None:
+        allow_ssl_fallback = True
 
-        # Cancel the timer
-        existing = timed_runs[device_id]
-        if existing.get("cancel_callback"):
-            existing["cancel_callback"]()
-        
-        del timed_runs[device_id]
-        
-        _LOGGER.info(f"Cancelled timed run for device {device_id}")
-        
-        # Fire event for card
-        hass.bus.async_fire(
-            f"{DOMAIN}_timed_run_cancelled",
-            {"device_id": device_id}
-        )
-        
-        _update_timed_run_sensor(device_id)
+    # Create a single shared coordinator for authentication
+    auth_coordinator = AromaLinkAuthCoordinator(
+        hass,
+        username=username,
+        password=password,
+        verify_ssl=verify_ssl,
+        allow_ssl_fallback=allow_ssl_fallback,
+    )
 
-    async def get_timed_run_status_service(call: ServiceCall):
-        """Get the status of timed runs."""
-        device_id = call.data.get("device_id")
-        
-        status = {}
-        current_time = hass.loop.time()
-        
-        for dev_id, timer_data in timed_runs.items():
-            if device_id and dev_id != device_id:
-                continue
-            remaining = max(0, timer_data["end_time"] - current_time)
-            status[dev_id] = {
-                "active": True,
-                "remaining_seconds": int(remaining),
-                "duration_hours": timer_data["duration_hours"]
-            }
-        
-        # Fire event with status
-        hass.bus.async_fire(
-            f"{DOMAIN}_timed_run_status",
-            {"status": status}
-        )
-        
-        return status
+    # Force first login and initialization
+    await auth_coordinator.async_config_entry_first_refresh()
 
-    START_TIMED_RUN_SCHEMA = vol.Schema({
-        vol.Optional("device_id"): cv.string,
-        vol.Optional("duration_hours", default=6.0): vol.All(vol.Coerce(float), vol.Range(min=0.1, max=24)),
-        vol.Optional("work_sec"): vol.All(vol.Coerce(int), vol.Range(min=1, max=999)),
-        vol.Optional("pause_sec"): vol.All(vol.Coerce(int), vol.Range(min=1, max=9999)),
-    })
+    # Store coordinators for each device
+    device_coordinators = {}
 
-    CANCEL_TIMED_RUN_SCHEMA = vol.Schema({
-        vol.Optional("device_id"): cv.string,
-    })
+    # Load persisted oil tracking/calibration state
+    oil_state_store = Store(hass, 1, f"{DOMAIN}_oil_state_{entry.entry_id}.json")
+    # Keys are device ids as strings; normalize in case older data used ints
+    oil_state_data = {
+        str(dev_id): state
+        for dev_id, state in (await oil_state_store.async_load() or {}).items()
+    }
 
-    GET_TIMED_RUN_STATUS_SCHEMA = vol.Schema({
-        vol.Optional("device_id"): cv.string,
-    })
+    def _oil_state_data():
+        """Return oil tracking/calibration state for all devices."""
+        return {
+            dev_id: coord.export_oil_state()
+            for dev_id, coord in device_coordinators.items()
+        }
 
-    hass.services.async_register(
-        DOMAIN,
-        "start_timed_run",
-        start_timed_run_service,
-        schema=START_TIMED_RUN_SCHEMA
-    )
+    def _save_oil_state():
+        """Schedule persisting oil state; bursts of requests share one write."""
+        oil_state_store.async_delay_save(_oil_state_data, OIL_STATE_SAVE_DELAY)
 
-    hass.services.async_register(
-        DOMAIN,
-        "cancel_timed_run",
-        cancel_timed_run_service,
-        schema=CANCEL_TIMED_RUN_SCHEMA
-    )
+    async def _flush_oil_state():
+        """Write any pending oil state before a reload reads the file again."""
+        if device_coordinators:
+            await oil_state_store.async_save(_oil_state_data())
 
-    hass.services.async_register(
-        DOMAIN,
-        "get_timed_run_status",
-        get_timed_run_status_service,
-        schema=GET_TIMED_RUN_STATUS_SCHEMA
-    )
+    entry.async_on_unload(_flush_oil_state)
 
-    # Store timed_runs reference in domain data for access by sensors
-    hass.data[DOMAIN]["timed_runs"] = timed_runs
+    poll_interval_seconds = _poll_interval_seconds(entry)
 
-    # ============================================================
-    # OIL TRACKING SERVICES
-    # ============================================================
+    async def _init_device(device):
+        """Create a device coordinator and do its first refresh."""
+        device_id = device[CONF_DEVICE_ID]
+        device_name = device.get("device_name", f"Device {device_id}")
 
-    async def reset_oil_runtime_service(call: ServiceCall):
-        """Reset oil tracking (call when refilling oil).
-        
-        Starts tracking cumulative work time using duty-cycle calculation.
-        Also captures pumpCount as secondary reference.
-        """
-        device_id = call.data.get("device_id")
+        _LOGGER.info(
+            "Initializing device coordinator for %s (%s)", device_name, device_id)
 
-        coordinator = None
-        if device_id and device_id in device_coordinators:
-            coordinator = device_coordinators[device_id]
-        elif len(device_coordinators) == 1:
-            coordinator = list(device_coordinators.values())[0]
+        device_coordinator = AromaLinkDeviceCoordinator(
+            hass,
+            auth_coordinator=auth_coordinator,
+            device_id=device_id,
+            device_name=device_name,
+            update_interval_seconds=poll_interval_seconds,
+            save_oil_state_cb=_save_oil_state,
+            oil_state=oil_state_data.get(str(device_id)),
+        )
+
+        await device_coordinator.async_config_entry_first_refresh()
+        return device_coordinator
+
+    # Initialize all devices concurrently; total latency is the slowest device
+    results = await asyncio.gather(
+        *(_init_device(device) for device in devices), return_exceptions=True
+    )
+    for device, result in zip(devices, results):
+        device_id = device[CONF_DEVICE_ID]
+        if isinstance(result, BaseException):
+            _LOGGER.error("Error initializing device %s: %s", device_id, result)
         else:
-            _LOGGER.error("Multiple devices available, must specify device_id")
-            return
+            device_coordinators[device_id] = result
 
-        # Get current pump count from last data refresh
-        current_pump_count = None
-        if coordinator.data:
-            current_pump_count = coordinator.data.get("pumpCount", 0)
-        
-        coordinator.reset_oil_tracking(current_pump_count)
-        
-        oil_info = coordinator.get_oil_tracking_info()
-        
-        _LOGGER.info(
-            f"Reset oil tracking for device {coordinator.device_id}. "
-            f"Baseline pumpCount: {current_pump_count}, "
-            f"Current settings: work={oil_info.get('last_work_duration')}s, "
-            f"pause={oil_info.get('last_pause_duration')}s"
-        )
-        
-        hass.bus.async_fire(
-            f"{DOMAIN}_oil_runtime_reset",
-            {
-                "device_id": coordinator.device_id,
-                "baseline_pump_count": current_pump_count,
-                "tracking_started": True,
-            }
+    if not device_coordinators:
+        _LOGGER.error("Failed to initialize any devices")
+        return False
+
+    hass.data[DOMAIN][entry.entry_id] = {
+        "auth_coordinator": auth_coordinator,
+        "device_coordinators": device_coordinators,
+        # Snapshot for telling which options changed in the update listener
+        "options": dict(entry.options),
+    }
+    hass.data[DOMAIN].pop(_ALL_COORDINATORS, None)
+
+    # Clean up old helper entities from previous version in the background;
+    # setup does not depend on it and the tasks are cancelled on unload
+    for device_id, coordinator in device_coordinators.items():
+        entry.async_create_background_task(
+            hass,
+            _cleanup_old_helpers(hass, coordinator.device_name, coordinator.helper_prefix),
+            name=f"{DOMAIN}_cleanup_old_helpers_{device_id}",
+            eager_start=True,
         )
 
-    RESET_OIL_RUNTIME_SCHEMA = vol.Schema({
-        vol.Optional("device_id"): cv.string,
-    })
+    # Start platform setup now; it only needs the coordinators and runs
+    # alongside the schedule prefetch and service registration below
+    forward_task = entry.async_create_task(
+        hass, hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    )
 
-    hass.services.async_register(
-        DOMAIN,
-        "reset_oil_runtime",
-        reset_oil_runtime_service,
-        schema=RESET_OIL_RUNTIME_SCHEMA
+    # Auto-fetch all schedules on startup (for dashboard matrix view)
+    _LOGGER.debug("Auto-fetching all schedules for devices %s", list(device_coordinators))
+    results = await asyncio.gather(
+        *(coordinator.async_fetch_all_schedules() for coordinator in device_coordinators.values()),
+        return_exceptions=True,
     )
+    for (device_id, coordinator), result in zip(device_coordinators.items(), results):
+        if isinstance(result, Exception):
+            _LOGGER.warning("Failed to auto-fetch schedules for device %s: %s", device_id, result)
+        else:
+            # Entities may already be added; let them pick up the schedules
+            coordinator.async_update_listeners()
 
-    # Use the new method
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    await forward_task
 
     return True
@@ -1,4 +1,5 @@
 """Button platform for Aroma-Link."""
+import asyncio
 import logging
 from homeassistant.components.button import ButtonEntity
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
@@ -8,6 +9,22 @@ from .const import DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
 
+# Program level -> API consistenceLevel
+_LEVEL_MAP = {1: "1", 2: "2", 3: "3"}
+
+
+def _prog_to_api(prog):
+    """Convert a cached program to a workTimeList entry."""
+    return {
+        "startTime": prog.get("start_time", "00:00"),
+        "endTime": prog.get("end_time", "23:59"),
+        "enabled": prog.get("enabled", 0),
+        "consistenceLevel": _LEVEL_MAP.get(prog.get("level", 1), "1"),
+        "workDuration": str(prog.get("work_sec", 10)),
+        "pauseDuration": str(prog.get("pause_sec", 120)),
+    }
+
+
 async def async_setup_entry(hass, entry, async_add_entities):
     """Set up Aroma-Link button based on a config entry."""
     data = hass.data[DOMAIN][entry.entry_id]
@@ -29,122 +46,89 @@ async def async_setup_entry(hass, entry, async_add_entities):
     
     async_add_entities(entities)
 
-class AromaLinkRunButton(ButtonEntity):
-    """Representation of an Aroma-Link run button."""
 
-    def __init__(self, coordinator, entry, device_id, device_name):
+class AromaLinkButtonBase(CoordinatorEntity, ButtonEntity):
+    """Base class for Aroma-Link buttons."""
+
+    def __init__(
+        self,
+        coordinator,
+        entry,
+        device_id,
+        device_name,
+        name,
+        unique_suffix,
+        icon=None,
+        entity_category=None,
+    ):
         """Initialize the button."""
-        self._coordinator = coordinator
+        super().__init__(coordinator)
         self._entry = entry
         self._device_id = device_id
-        self._name = f"{device_name} Run"
-        self._unique_id = f"{entry.data['username']}_{device_id}_run"
-
-    @property
-    def name(self):
-        """Return the name of the button."""
-        return self._name
-
-    @property
-    def unique_id(self):
-        """Return a unique ID for this entity."""
-        return self._unique_id
-
-    @property
-    def device_info(self):
-        """Return device information about this Aroma-Link device."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, f"{self._entry.data['username']}_{self._device_id}")},
-            name=self._coordinator.device_name,
+        # Identity never changes, so set it once instead of via properties
+        self._attr_name = f"{device_name} {name}"
+        self._attr_unique_id = f"{entry.data['username']}_{device_id}_{unique_suffix}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"{entry.data['username']}_{device_id}")},
+            name=coordinator.device_name,
             manufacturer="Aroma-Link",
             model="Diffuser",
         )
+        if icon:
+            self._attr_icon = icon
+        if entity_category:
+            self._attr_entity_category = entity_category
+
+
+class AromaLinkRunButton(AromaLinkButtonBase):
+    """Representation of an Aroma-Link run button."""
+
+    def __init__(self, coordinator, entry, device_id, device_name):
+        """Initialize the button."""
+        super().__init__(coordinator, entry, device_id, device_name, "Run", "run")
 
     async def async_press(self):
         """Run the diffuser for a fixed time."""
-        work_duration = self._coordinator.work_duration
-        pause_duration = self._coordinator.pause_duration
+        work_duration = self.coordinator.work_duration
+        pause_duration = self.coordinator.pause_duration
         
-        _LOGGER.info(f"Button pressed. Running diffuser with {work_duration}s work and {pause_duration}s pause settings")
+        _LOGGER.info("Button pressed. Running diffuser with %ss work and %ss pause settings", work_duration, pause_duration)
         
-        await self._coordinator.run_diffuser(work_duration, pause_duration=pause_duration)
+        await self.coordinator.run_diffuser(work_duration, pause_duration=pause_duration)
 
-class AromaLinkSaveSettingsButton(ButtonEntity):
+
+class AromaLinkSaveSettingsButton(AromaLinkButtonBase):
     """Representation of an Aroma-Link save settings button."""
 
     def __init__(self, coordinator, entry, device_id, device_name):
         """Initialize the button."""
-        self._coordinator = coordinator
-        self._entry = entry
-        self._device_id = device_id
-        self._name = f"{device_name} Save Settings"
-        self._unique_id = f"{entry.data['username']}_{device_id}_save_settings"
-        self._attr_icon = "mdi:content-save"
-
-    @property
-    def name(self):
-        """Return the name of the button."""
-        return self._name
-
-    @property
-    def unique_id(self):
-        """Return a unique ID for this entity."""
-        return self._unique_id
-
-    @property
-    def device_info(self):
-        """Return device information about this Aroma-Link device."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, f"{self._entry.data['username']}_{self._device_id}")},
-            name=self._coordinator.device_name,
-            manufacturer="Aroma-Link",
-            model="Diffuser",
+        super().__init__(
+            coordinator, entry, device_id, device_name,
+            "Save Settings",
+            "save_settings",
+            icon="mdi:content-save",
         )
 
     async def async_press(self):
         """Save the current work duration and pause duration settings."""
-        work_duration = self._coordinator.work_duration
-        pause_duration = self._coordinator.pause_duration
+        work_duration = self.coordinator.work_duration
+        pause_duration = self.coordinator.pause_duration
         
-        _LOGGER.info(f"Saving settings: work_duration={work_duration}s, pause_duration={pause_duration}s")
+        _LOGGER.info("Saving settings: work_duration=%ss, pause_duration=%ss", work_duration, pause_duration)
         
-        result = await self._coordinator.set_scheduler(work_duration, pause_duration)
+        result = await self.coordinator.set_scheduler(work_duration, pause_duration)
         if result:
-            _LOGGER.info(f"Settings saved successfully for {self._coordinator.device_name}")
+            _LOGGER.info("Settings saved successfully for %s", self.coordinator.device_name)
         else:
-            _LOGGER.error(f"Failed to save settings for {self._coordinator.device_name}")
+            _LOGGER.error("Failed to save settings for %s", self.coordinator.device_name)
 
 
-class AromaLinkSaveProgramButton(CoordinatorEntity, ButtonEntity):
+class AromaLinkSaveProgramButton(AromaLinkButtonBase):
     """Save Program button."""
 
     def __init__(self, coordinator, entry, device_id, device_name):
-        """Initialize."""
-        super().__init__(coordinator)
-        self._entry = entry
-        self._device_id = device_id
-        self._name = f"{device_name} Save Program"
-        self._unique_id = f"{entry.data['username']}_{device_id}_save_program"
-
-    @property
-    def name(self):
-        """Return the name of the button."""
-        return self._name
-
-    @property
-    def unique_id(self):
-        """Return a unique ID for this entity."""
-        return self._unique_id
-
-    @property
-    def device_info(self):
-        """Return device information about this Aroma-Link device."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, f"{self._entry.data['username']}_{self._device_id}")},
-            name=self.coordinator.device_name,
-            manufacturer="Aroma-Link",
-            model="Diffuser",
-        )
+        """Initialize the button."""
+        super().__init__(coordinator, entry, device_id, device_name, "Save Program", "save_program")
 
     async def async_press(self):
         """Save the program to selected days - OPTIMIZED to batch days with identical schedules."""
@@ -182,6 +166,14 @@ class AromaLinkSaveProgramButton(CoordinatorEntity, ButtonEntity):
         import json
         day_schedules = {}  # day -> (schedule_list, work_time_list)
         
+        # Fetch the base schedules of the other days concurrently
+        fetch_days = [day for day in selected_days if day != current_day]
+        fetched = await asyncio.gather(
+            *(self.coordinator.fetch_workset_for_day(day) for day in fetch_days),
+            return_exceptions=True,
+        )
+        fetched_schedules = dict(zip(fetch_days, fetched))
+        
         for day in selected_days:
             # Get base schedule for this day
             if day == current_day:
@@ -189,34 +181,25 @@ class AromaLinkSaveProgramButton(CoordinatorEntity, ButtonEntity):
                 if schedule:
                     schedule = [prog.copy() for prog in schedule]  # Deep copy
             else:
-                schedule = await self.coordinator.fetch_workset_for_day(day)
+                schedule = fetched_schedules[day]
+                if isinstance(schedule, Exception):
+                    _LOGGER.error("Failed to get schedule for day %s: %s", day, schedule)
+                    continue
 
             if not schedule:
                 _LOGGER.error("Failed to get schedule for day %s", day)
                 continue
 
-            # Replace the selected program with the edited data
+            # Replace the selected program with the edited data, keeping
+            # this day's own setting id (_prog_to_api supplies defaults for
+            # any missing field)
             schedule[program_num - 1] = {
-                "enabled": edited_program.get("enabled", 0),
-                "start_time": edited_program.get("start_time", "00:00"),
-                "end_time": edited_program.get("end_time", "23:59"),
-                "work_sec": edited_program.get("work_sec", 10),
-                "pause_sec": edited_program.get("pause_sec", 120),
-                "level": edited_program.get("level", 1),
+                **edited_program,
+                "setting_id": schedule[program_num - 1].get("setting_id"),
             }
 
             # Convert to API format
-            level_map = {1: "1", 2: "2", 3: "3"}
-            work_time_list = []
-            for prog in schedule:
-                work_time_list.append({
-                    "startTime": prog.get("start_time", "00:00"),
-                    "endTime": prog.get("end_time", "23:59"),
-                    "enabled": prog.get("enabled", 0),
-                    "consistenceLevel": level_map.get(prog.get("level", 1), "1"),
-                    "workDuration": str(prog.get("work_sec", 10)),
-                    "pauseDuration": str(prog.get("pause_sec", 120))
-                })
+            work_time_list = [_prog_to_api(prog) for prog in schedule]
             
             day_schedules[day] = (schedule, work_time_list)
 
@@ -233,12 +216,20 @@ class AromaLinkSaveProgramButton(CoordinatorEntity, ButtonEntity):
         # Step 3: Make ONE API call per unique schedule (batching multiple days!)
         _LOGGER.info("Optimized: %d days grouped into %d API calls", len(selected_days), len(schedule_groups))
         
-        for schedule_key, (days, work_time_list, schedules) in schedule_groups.items():
-            _LOGGER.info("Saving to days %s in single API call", days)
-            
-            # BATCH: Send multiple days in one call!
-            result = await self.coordinator.set_workset(days, work_time_list, skip_refresh=True)
-            if result:
+        # The groups cover disjoint days, so their saves can run concurrently
+        groups = list(schedule_groups.values())
+        results = await asyncio.gather(
+            *(
+                self.coordinator.set_workset(days, work_time_list, skip_refresh=True)
+                for days, work_time_list, _ in groups
+            ),
+            return_exceptions=True,
+        )
+        
+        for (days, _, schedules), result in zip(groups, results):
+            if isinstance(result, Exception):
+                _LOGGER.error("Failed to save program %s to days %s: %s", program_num, days, result)
+            elif result:
                 _LOGGER.info("Saved program %s to days %s", program_num, days)
                 # Update cache for all days in this batch
                 for day in days:
@@ -246,42 +237,41 @@ class AromaLinkSaveProgramButton(CoordinatorEntity, ButtonEntity):
             else:
                 _LOGGER.error("Failed to save program %s to days %s", program_num, days)
 
-        # Single refresh at the end
+        # Single refresh at the end. The cache already holds the saved
+        # schedules, so repaint now and re-read the current day from the
+        # cloud in the background.
         await self.coordinator.async_request_refresh()
-        await self.coordinator.async_refresh_schedule(current_day)
+        self.coordinator.async_update_listeners()
+        self._entry.async_create_background_task(
+            self.hass,
+            self._async_verify_schedule(current_day),
+            f"{DOMAIN}_verify_schedule_{self._device_id}",
+        )
+
+    async def _async_verify_schedule(self, day):
+        """Re-read a saved day from the cloud and repaint with the result."""
+        saved = [prog.copy() for prog in self.coordinator._schedule_cache.get(day) or []]
+        workset = await self.coordinator.fetch_workset_for_day(day)
+        if not workset:
+            return
+        # Keep helper edits the user made while the fetch was in flight
+        if self.coordinator._schedule_cache.get(day) != saved:
+            _LOGGER.debug("Schedule for day %s edited during refresh, keeping edits", day)
+            return
+        self.coordinator._schedule_cache[day] = workset
         self.coordinator.async_update_listeners()
 
 
-class AromaLinkSyncSchedulesButton(CoordinatorEntity, ButtonEntity):
+class AromaLinkSyncSchedulesButton(AromaLinkButtonBase):
     """Sync Schedules with Aroma-Link button."""
 
     def __init__(self, coordinator, entry, device_id, device_name):
-        """Initialize."""
-        super().__init__(coordinator)
-        self._entry = entry
-        self._device_id = device_id
-        self._name = f"{device_name} Sync Schedules"
-        self._unique_id = f"{entry.data['username']}_{device_id}_sync_schedules"
-        self._attr_icon = "mdi:cloud-sync"
-
-    @property
-    def name(self):
-        """Return the name of the button."""
-        return self._name
-
-    @property
-    def unique_id(self):
-        """Return a unique ID for this entity."""
-        return self._unique_id
-
-    @property
-    def device_info(self):
-        """Return device information about this Aroma-Link device."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, f"{self._entry.data['username']}_{self._device_id}")},
-            name=self.coordinator.device_name,
-            manufacturer="Aroma-Link",
-            model="Diffuser",
+        """Initialize the button."""
+        super().__init__(
+            coordinator, entry, device_id, device_name,
+            "Sync Schedules",
+            "sync_schedules",
+            icon="mdi:cloud-sync",
         )
 
     async def async_press(self):
@@ -296,34 +286,17 @@ class AromaLinkSyncSchedulesButton(CoordinatorEntity, ButtonEntity):
 # OIL TRACKING BUTTONS
 # ============================================================
 
-class AromaLinkOilCalibrationToggleButton(CoordinatorEntity, ButtonEntity):
+class AromaLinkOilCalibrationToggleButton(AromaLinkButtonBase):
     """Button to start/end/resume calibration measurement."""
 
     def __init__(self, coordinator, entry, device_id, device_name):
-        """Initialize."""
-        super().__init__(coordinator)
-        self._entry = entry
-        self._device_id = device_id
-        self._name = f"{device_name} Calibration Measurement"
-        self._unique_id = f"{entry.data['username']}_{device_id}_oil_calibration_toggle"
-        self._attr_icon = "mdi:flask-outline"
-        self._attr_entity_category = EntityCategory.CONFIG
-
-    @property
-    def name(self):
-        return self._name
-
-    @property
-    def unique_id(self):
-        return self._unique_id
-
-    @property
-    def device_info(self):
-        return DeviceInfo(
-            identifiers={(DOMAIN, f"{self._entry.data['username']}_{self._device_id}")},
-            name=self.coordinator.device_name,
-            manufacturer="Aroma-Link",
-            model="Diffuser",
+        """Initialize the button."""
+        super().__init__(
+            coordinator, entry, device_id, device_name,
+            "Calibration Measurement",
+            "oil_calibration_toggle",
+            icon="mdi:flask-outline",
+            entity_category=EntityCategory.CONFIG,
         )
 
     async def async_press(self):
@@ -341,34 +314,17 @@ class AromaLinkOilCalibrationToggleButton(CoordinatorEntity, ButtonEntity):
         self.coordinator.async_update_listeners()
 
 
-class AromaLinkOilCalibrationFinalizeButton(CoordinatorEntity, ButtonEntity):
+class AromaLinkOilCalibrationFinalizeButton(AromaLinkButtonBase):
     """Button to finalize calibration and compute usage rate."""
 
     def __init__(self, coordinator, entry, device_id, device_name):
-        """Initialize."""
-        super().__init__(coordinator)
-        self._entry = entry
-        self._device_id = device_id
-        self._name = f"{device_name} Calibration Finalize"
-        self._unique_id = f"{entry.data['username']}_{device_id}_oil_calibration_finalize"
-        self._attr_icon = "mdi:check-circle-outline"
-        self._attr_entity_category = EntityCategory.CONFIG
-
-    @property
-    def name(self):
-        return self._name
-
-    @property
-    def unique_id(self):
-        return self._unique_id
-
-    @property
-    def device_info(self):
-        return DeviceInfo(
-            identifiers={(DOMAIN, f"{self._entry.data['username']}_{self._device_id}")},
-            name=self.coordinator.device_name,
-            manufacturer="Aroma-Link",
-            model="Diffuser",
+        """Initialize the button."""
+        super().__init__(
+            coordinator, entry, device_id, device_name,
+            "Calibration Finalize",
+            "oil_calibration_finalize",
+            icon="mdi:check-circle-outline",
+            entity_category=EntityCategory.CONFIG,
         )
 
     async def async_press(self):
@@ -391,34 +347,17 @@ class AromaLinkOilCalibrationFinalizeButton(CoordinatorEntity, ButtonEntity):
         self.coordinator.async_update_listeners()
 
 
-class AromaLinkOilRefillKeepCalibrationButton(CoordinatorEntity, ButtonEntity):
+class AromaLinkOilRefillKeepCalibrationButton(AromaLinkButtonBase):
     """Button to refill oil without resetting calibration."""
 
     def __init__(self, coordinator, entry, device_id, device_name):
-        """Initialize."""
-        super().__init__(coordinator)
-        self._entry = entry
-        self._device_id = device_id
-        self._name = f"{device_name} Refill (Keep Calibration)"
-        self._unique_id = f"{entry.data['username']}_{device_id}_oil_refill_keep_calibration"
-        self._attr_icon = "mdi:water-plus-outline"
-        self._attr_entity_category = EntityCategory.CONFIG
-
-    @property
-    def name(self):
-        return self._name
-
-    @property
-    def unique_id(self):
-        return self._unique_id
-
-    @property
-    def device_info(self):
-        return DeviceInfo(
-            identifiers={(DOMAIN, f"{self._entry.data['username']}_{self._device_id}")},
-            name=self.coordinator.device_name,
-            manufacturer="Aroma-Link",
-            model="Diffuser",
+        """Initialize the button."""
+        super().__init__(
+            coordinator, entry, device_id, device_name,
+            "Refill (Keep Calibration)",
+            "oil_refill_keep_calibration",
+            icon="mdi:water-plus-outline",
+            entity_category=EntityCategory.CONFIG,
         )
 
     async def async_press(self):
@@ -428,34 +367,17 @@ class AromaLinkOilRefillKeepCalibrationButton(CoordinatorEntity, ButtonEntity):
         self.coordinator.async_update_listeners()
 
 
-class AromaLinkOilManualOverrideButton(CoordinatorEntity, ButtonEntity):
+class AromaLinkOilManualOverrideButton(AromaLinkButtonBase):
     """Button to apply manual calibration override."""
 
     def __init__(self, coordinator, entry, device_id, device_name):
-        """Initialize."""
-        super().__init__(coordinator)
-        self._entry = entry
-        self._device_id = device_id
-        self._name = f"{device_name} Apply Manual Calibration"
-        self._unique_id = f"{entry.data['username']}_{device_id}_oil_manual_override"
-        self._attr_icon = "mdi:tune-variant"
-        self._attr_entity_category = EntityCategory.CONFIG
-
-    @property
-    def name(self):
-        return self._name
-
-    @property
-    def unique_id(self):
-        return self._unique_id
-
-    @property
-    def device_info(self):
-        return DeviceInfo(
-            identifiers={(DOMAIN, f"{self._entry.data['username']}_{self._device_id}")},
-            name=self.coordinator.device_name,
-            manufacturer="Aroma-Link",
-            model="Diffuser",
+        """Initialize the button."""
+        super().__init__(
+            coordinator, entry, device_id, device_name,
+            "Apply Manual Calibration",
+            "oil_manual_override",
+            icon="mdi:tune-variant",
+            entity_category=EntityCategory.CONFIG,
         )
 
     async def async_press(self):
@@ -21,6 +21,7 @@ DEFAULT_POLL_INTERVAL_SECONDS = 60  # Default: 60 seconds (1 minute)
 MIN_POLL_INTERVAL_SECONDS = 5  # Minimum: 5 seconds (use with caution!)
 MAX_POLL_INTERVAL_SECONDS = 900  # Maximum: 15 minutes
 DEFAULT_DEBUG_LOGGING = False
+OIL_STATE_SAVE_DELAY = 10  # seconds to coalesce oil state writes
 DEFAULT_VERIFY_SSL = True
 DEFAULT_ALLOW_SSL_FALLBACK = True
 
@@ -30,6 +31,11 @@ SERVICE_RUN_DIFFUSER = "run_diffuser"
 SERVICE_LOAD_WORKSET = "load_workset"
 SERVICE_SAVE_WORKSET = "save_workset"
 
+# Events
+# Timed-run lifecycle; event data "kind" is started/cancelled/status/complete
+EVENT_TIMED_RUN = f"{DOMAIN}_timed_run"
+EVENT_OIL_RUNTIME_RESET = f"{DOMAIN}_oil_runtime_reset"
+
 # Attributes
 ATTR_DURATION = "duration"
 ATTR_DIFFUSE_TIME = "diffuse_time"